@@ -131,8 +131,8 @@ class Forecast
                 return response()->json(['succeed'=>false,'status'=>500,'message'=>'latest.json missing shape/bbox'], 500);
             }
 
-            $V    = $latest['data']['value'] ?? null;   // HxW base values
-            $AGE  = $latest['data']['age_h'] ?? null;   // HxW age in hours since observation
+            $V    = $this->decodeI16Grid($latest['data']['value'] ?? null, $latest['encoding']['value'] ?? null);   // HxW base values
+            $AGE  = $this->decodeI16Grid($latest['data']['age_h'] ?? null, $latest['encoding']['age_h'] ?? null);   // HxW age in hours since observation
             if (!is_array($V) || !is_array($AGE)) {
                 return response()->json(['succeed'=>false,'status'=>500,'message'=>'latest.json missing data.value/age_h'], 500);
             }
@@ -153,7 +153,7 @@ class Forecast
             $HOD = [];
             for ($h=0; $h<24; $h++) {
                 $slice = $this->readJsonSimple(sprintf("%s/hour_%02d.json", $hodDir, $h));
-                $HOD[$h] = is_array($slice) ? ($slice['data'] ?? null) : null;
+                $HOD[$h] = is_array($slice) ? $this->decodeI16Grid($slice['data'] ?? null, $slice) : null;
             }
             $hodMetaJs = $this->readJsonSimple($hodMeta);
             $newestGid = is_array($hodMetaJs) ? ($hodMetaJs['newest_gid'] ?? null) : null;
@@ -687,13 +687,23 @@ class Forecast
             'bbox'  => $payload['bbox']  ?? ($idx['bbox'] ?? null),
             'shape' => $payload['shape'] ?? ($idx['shape'] ?? null),
         ];
-        if (isset($payload['u10'])) $out['u10'] = $payload['u10'];
-        if (isset($payload['v10'])) $out['v10'] = $payload['v10'];
-        if (isset($payload['blh'])) $out['blh'] = $payload['blh'];
+        if (isset($payload['u10'])) $out['u10'] = $this->expandMeteoField($payload['u10'], $out['shape']);
+        if (isset($payload['v10'])) $out['v10'] = $this->expandMeteoField($payload['v10'], $out['shape']);
+        if (isset($payload['blh'])) $out['blh'] = $this->expandMeteoField($payload['blh'], $out['shape']);
         $out['__path'] = $pathUsed;
         return $out;
     }
 
+    // Uniform fields may be written as {"const": v, "shape": [H,W]} (WEATHER_CONST_FIELDS=1)
+    private function expandMeteoField($f, $shape) {
+        if (!is_array($f) || !array_key_exists('const', $f)) return $f;
+        $sh = $f['shape'] ?? $shape;
+        $H = (int)($sh[0] ?? 0); $W = (int)($sh[1] ?? 0);
+        if ($H <= 0 || $W <= 0) return null;
+        $row = array_fill(0, $W, (float)$f['const']);
+        return array_fill(0, $H, $row);
+    }
+
     /**
      * Strict checker for meteo-vs-product shape and bbox compatibility.
      */
@@ -990,6 +1000,20 @@ class Forecast
     /** Safe float cast: numeric -> float, else NaN */
     private function toFloat($v): float { if ($v === null) return NAN; if (is_numeric($v)) return (float)$v; return NAN; }
 
+    // build_tempo_forecast_summaries --quantize grids: int16, phys = data / scale (nodata -> null)
+    private function decodeI16Grid($grid, $enc) {
+        if (!is_array($grid) || !is_array($enc) || empty($enc['scale'])) return $grid;
+        $scale  = (float)$enc['scale'];
+        $nodata = (int)($enc['nodata'] ?? -32768);
+        foreach ($grid as &$row) {
+            if (!is_array($row)) continue;
+            foreach ($row as &$v) $v = ($v === null || (int)$v === $nodata) ? null : $v / $scale;
+            unset($v);
+        }
+        unset($row);
+        return $grid;
+    }
+
     /** HOD accessor with bounds checks */
     private function hodAt(array $HOD, int $hour, int $y, int $x): float {
         $slice = $HOD[$hour] ?? null;
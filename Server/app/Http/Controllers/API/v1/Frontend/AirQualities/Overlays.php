@@ -100,6 +100,10 @@ class Overlays
         }
 
         $g = $this->readJsonFileSafely($granulePath);
+        // tempo_to_json --data-b64 granules carry the grid as base64 little-endian float32 (NaN = no data)
+        if (is_array($g) && empty($g['data']) && ($g['data_encoding'] ?? null) === 'f32le_b64') {
+            $g['data'] = $this->decodeF32leB64((string)($g['data_b64'] ?? ''), $g['shape'] ?? null);
+        }
         if (!is_array($g) || empty($g['data']) || empty($g['shape']) || empty($g['bbox'])) {
             return response()->json(['succeed'=>false,'status'=>422,'message'=>"Granule JSON structure is incomplete."], 422);
         }
@@ -330,6 +334,15 @@ class Overlays
         return is_numeric($v) && is_finite((float)$v);
     }
 
+    // Base64 little-endian float32 grid -> 2D [rows][cols] (null on size mismatch)
+    private function decodeF32leB64(string $b64, $shape): ?array
+    {
+        [$rows, $cols] = $this->normalizeShape($shape);
+        $bin = base64_decode($b64, true);
+        if ($rows <= 0 || $cols <= 0 || $bin === false || strlen($bin) !== 4 * $rows * $cols) return null;
+        return array_chunk(array_values(unpack('g*', $bin)), $cols);
+    }
+
     private function parseIsoToTs(?string $iso): ?int
     {
         if (!$iso) return null;
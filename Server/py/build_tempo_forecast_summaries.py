@@ -5,7 +5,7 @@ build_tempo_forecast_summaries.py — CLEAN & SAFE (NaN→None + timezone-aware)
 - latest.json: last valid value per cell + data age (hours)
 - hod/: hourly-of-day (0..23) mean over the product grid
 - Hard cleanup: drop NaN/Inf/invalid negatives/outliers before computation
-- JSON-safe: convert all NaN/Inf to None before json.dump
+- JSON-safe: all NaN/Inf are written as null (orjson if installed, stdlib json otherwise)
 - datetimes: timezone-aware (UTC)
 
 Run:
@@ -14,14 +14,26 @@ Run:
 """
 
 import argparse
+import base64
 import json
 import os
 import sys
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Tuple, Optional
 
+try:
+    import orjson  # fast C parser/serializer (native numpy, NaN -> null)
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange  # optional JIT for the grid reductions
+except ImportError:
+    njit = None
+
 ISO_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
 # Same reasonable limits used in tempo_to_json
@@ -31,9 +43,22 @@ SPEC = {
     "o3tot": {"allow_zero": True,  "min": 0.0, "max": 700.0},
     "cldo4": {"allow_zero": True,  "min": 0.0, "max": 1.0},
 }
+# --quantize: int16 = round(phys * scale), scale maps the product max onto the full int16 range
+for _s in SPEC.values():
+    _s["scale"] = 32767.0 / _s["max"]
+del _s
 ABSURD_NEG = -1e20
 ABSURD_POS =  1e20
 
+# Granule json size sanity bounds (per grid cell): "0," .. "-1.234567890123e+16,"
+MIN_BYTES_PER_CELL = 2
+MAX_BYTES_PER_CELL = 32
+HEADER_SLACK_BYTES = 256 * 1024  # lat/lon axes + metadata
+
+# int16 quantized output (--quantize)
+NODATA_I16 = -32768
+AGE_SCALE  = 100.0   # age_h in 0.01 h steps
+
 
 def parse_iso8601(ts: str) -> Optional[int]:
     if not ts:
@@ -64,31 +89,161 @@ def parse_iso8601(ts: str) -> Optional[int]:
 
 def load_json(path: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
     except Exception:
         return None
 
 
+def _json_default(o):
+    # stdlib fallback only: ndarray -> nested list with NaN/±Inf -> None
+    if isinstance(o, np.ndarray):
+        out = o.astype(object)
+        mask = ~np.isfinite(o)
+        if mask.any():
+            out[mask] = None
+        return out.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def write_json(path: str, payload: Dict[str, Any]) -> None:
+    """Compact UTF-8 JSON; ndarrays are written directly, NaN/±Inf -> null."""
+    if orjson is not None:
+        raw = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"),
+                         allow_nan=False, default=_json_default).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(raw)
+
+
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def compute_local_hour(utc_end_ts: int, lon_deg_2d: np.ndarray) -> np.ndarray:
-    offset_sec = (lon_deg_2d / 360.0) * 86400.0
-    local_ts = utc_end_ts + offset_sec
-    local_hour = np.floor(local_ts / 3600.0) % 24.0
-    return local_hour.astype(np.int16)
+def lon_hour_offsets(lon_deg_2d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Solar-time offset lon/15 in hours (float) and its floor (int); lon is fixed per run."""
+    lon_h = (np.asarray(lon_deg_2d) / 15.0).astype(np.float32)
+    return lon_h, np.floor(lon_h).astype(np.int16)
+
+
+def compute_local_hour(utc_end_ts: int, lon_h: np.ndarray, lon_h_floor: np.ndarray) -> np.ndarray:
+    # local_hour = floor(end_ts/3600 + lon/15) mod 24, with the lon term precomputed
+    q, r = divmod(int(utc_end_ts), 3600)
+    if r == 0:
+        local_hour = lon_h_floor + np.int16(q % 24)
+    else:
+        local_hour = np.floor(lon_h + np.float32(r / 3600.0)).astype(np.int16) + np.int16(q % 24)
+    return (local_hour % 24).astype(np.int8)
 
 
 def to_float_grid(a) -> np.ndarray:
-    return np.array(a, dtype=float)
+    # float32 is ample for TEMPO columns (~3-4 significant digits)
+    return np.asarray(a, dtype=np.float32)
+
+
+def granule_grid(g: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Grid from a granule json: nested "data" list, or "data_b64" (tempo_to_json --data-b64)."""
+    if g.get("data_encoding") == "f32le_b64" and isinstance(g.get("data_b64"), str):
+        try:
+            H, W = (int(n) for n in g["shape"])
+            return np.frombuffer(base64.b64decode(g["data_b64"]), dtype="<f4").reshape(H, W)
+        except Exception:
+            return None
+    if g.get("data") is None:
+        return None
+    return to_float_grid(g["data"])
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _sanitize(flat, allow_zero, vmin, vmax):
+        # one fused pass over the flat grid (in place)
+        for i in prange(flat.size):
+            x = flat[i]
+            if not np.isfinite(x) or x < ABSURD_NEG or x > ABSURD_POS:
+                flat[i] = np.nan
+            elif allow_zero:
+                if x < vmin:
+                    flat[i] = vmin
+                elif x > vmax:
+                    flat[i] = vmax
+            elif x <= 0.0:
+                flat[i] = np.nan
+            elif x > vmax:
+                flat[i] = vmax
+
+
+def granule_size_ok(path: str, shape: Tuple[int, int]) -> bool:
+    """stat()-only check that a granule json can hold an HxW grid (skips truncated/bogus files)."""
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return False
+    n = shape[0] * shape[1]
+    return n * MIN_BYTES_PER_CELL <= size <= n * MAX_BYTES_PER_CELL + HEADER_SLACK_BYTES
+
+
+def load_granule_grid(path: str, shape: Tuple[int, int]) -> Optional[np.ndarray]:
+    """Granule json -> float grid, or None if unreadable / wrong shape."""
+    if not granule_size_ok(path, shape):
+        return None
+    g = load_json(path)
+    if not g:
+        return None
+    grid = granule_grid(g)
+    if grid is None or grid.shape != shape:
+        return None
+    return grid
+
+
+def load_npy_grid(npy_path: str, src_path: str,
+                  shape: Tuple[int, int]) -> Optional[np.ndarray]:
+    """
+    Memory-mapped float32 grid from a .npy (sanitized cache or tempo_to_json sidecar),
+    or None if missing / older than its granule json / wrong shape.
+    """
+    try:
+        if os.path.getmtime(npy_path) < os.path.getmtime(src_path):
+            return None
+        grid = np.load(npy_path, mmap_mode="r")
+    except Exception:
+        return None
+    if grid.shape != shape or not np.issubdtype(grid.dtype, np.floating):
+        return None
+    return grid.astype(np.float32, copy=False)
+
+
+def save_cached_grid(cache_path: str, grid: np.ndarray) -> None:
+    tmp = cache_path + ".part"
+    try:
+        with open(tmp, "wb") as f:
+            np.save(f, grid)
+        os.replace(tmp, cache_path)
+    except Exception:
+        pass
+
+
+def prune_cache(cache_dir: str, keep_gids) -> None:
+    """Drop cached grids of granules that left the time window."""
+    for fn in os.listdir(cache_dir):
+        if fn.endswith(".npy") and fn[:-4] not in keep_gids:
+            try:
+                os.remove(os.path.join(cache_dir, fn))
+            except Exception:
+                pass
 
 
 def sanitize_grid(grid: np.ndarray, product: str) -> np.ndarray:
     spec = SPEC.get(product, {"allow_zero": False, "min": 0.0, "max": 1.0})
     allow_zero = spec["allow_zero"]
-    g = grid.astype(float, copy=True)
+    g = grid.astype(np.float32, copy=True)
+    if njit is not None:
+        _sanitize(g.reshape(-1), allow_zero, float(spec["min"]), float(spec["max"]))
+        return g
     g[~np.isfinite(g)] = np.nan
     g[g < ABSURD_NEG] = np.nan
     g[g > ABSURD_POS] = np.nan
@@ -100,78 +255,150 @@ def sanitize_grid(grid: np.ndarray, product: str) -> np.ndarray:
     return g
 
 
-def jsonable_2d(arr: np.ndarray, ndigits: int = 6) -> list:
+def quantize_grid(arr: np.ndarray, scale: float) -> np.ndarray:
+    """
+    np.ndarray -> int16 ndarray, phys = data / scale:
+    - out-of-range values are clamped to ±32767
+    - NaN/±Inf -> NODATA_I16
     """
-    np.ndarray -> nested Python list, with:
-    - rounding
-    - NaN/±Inf -> None (JSON-safe)
+    q = np.round(np.asarray(arr, dtype=np.float32) * np.float32(scale))
+    bad = ~np.isfinite(q)
+    np.clip(q, -32767, 32767, out=q)
+    q[bad] = NODATA_I16
+    return q.astype(np.int16)
+
+
+def encode_grid(arr: np.ndarray, ndigits: int, scale: Optional[float] = None) -> np.ndarray:
     """
-    a = np.asarray(arr, dtype=float)
-    if ndigits is not None:
-        a = np.round(a, decimals=ndigits)   # fixed
-    out = a.astype(object)
-    mask = ~np.isfinite(a)
-    if mask.any():
-        out[mask] = None
-    return out.tolist()
+    Grid as handed to write_json (one dumps per file, no per-cell Python objects):
+    - scale given: int16 via quantize_grid
+    - otherwise: rounded floats, NaN/±Inf kept and written as null; float32 for
+      orjson (shortest repr), float64 for the stdlib fallback (no float32 noise digits)
+    """
+    if scale is not None:
+        return quantize_grid(arr, scale)
+    dtype = np.float32 if orjson is not None else np.float64
+    return np.round(np.asarray(arr, dtype=dtype), decimals=ndigits)
+
+
+def encoding_info(scale: float) -> Dict[str, Any]:
+    return {"type": "int16", "scale": scale, "nodata": NODATA_I16,
+            "inverse": "phys = data / scale"}
 
 
-def build_latest(values_stack: List[Tuple[int, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, int]:
+def aligned_empty(shape, dtype, align: int = 64) -> np.ndarray:
+    """Uninitialized C-contiguous array whose data pointer is `align`-byte aligned."""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buf = np.empty(nbytes + align, dtype=np.uint8)
+    off = (-buf.ctypes.data) % align
+    return buf[off:off + nbytes].view(dtype).reshape(shape)
+
+
+def aligned_zeros(shape, dtype, align: int = 64) -> np.ndarray:
+    a = aligned_empty(shape, dtype, align)
+    a.fill(0)
+    return a
+
+
+def stack_granules(values_stack: List[Tuple[int, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(end_ts, grid) list (already oldest -> newest) -> end_ts array (N,) and grid stack (N, H, W)."""
     if not values_stack:
         raise ValueError("No granule data provided.")
-    values_stack.sort(key=lambda t: t[0])  # oldest -> newest
-
-    latest = None
-    latest_ts = None
-    for end_ts, grid in values_stack:
-        if latest is None:
-            latest = grid.copy()
-            latest_ts = np.full_like(latest, fill_value=float(end_ts), dtype=float)
-        else:
-            mask_new = np.isfinite(grid)
-            latest[mask_new] = grid[mask_new]
-            latest_ts[mask_new] = float(end_ts)
+    ts = np.array([t for t, _ in values_stack], dtype=np.int64)
+    H, W = values_stack[0][1].shape
+    stack = aligned_empty((len(values_stack), H, W), np.float32)
+    for k, (_, g) in enumerate(values_stack):
+        stack[k] = g
+    return ts, stack
+
+
+def build_latest(ts: np.ndarray, stack: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Last finite value per cell along time (stack is oldest -> newest) and its age in hours."""
+    N = stack.shape[0]
+    finite = np.isfinite(stack)
+    any_finite = finite.any(axis=0)
+    last_idx = (N - 1) - finite[::-1].argmax(axis=0)
+    latest = np.take_along_axis(stack, last_idx[None], axis=0)[0]
+    latest[~any_finite] = np.nan
+    newest_end_ts = int(ts[-1])
+    # per-cell end time as int32 seconds relative to the newest granule (<= 0)
+    latest_rel = (ts - newest_end_ts).astype(np.int32)[last_idx]
 
     now_ts = time.time()
-    age_h = (now_ts - latest_ts) / 3600.0
-    age_h[~np.isfinite(latest)] = np.nan
-    newest_end_ts = int(values_stack[-1][0])
+    age_h = ((now_ts - newest_end_ts - latest_rel) / 3600.0).astype(np.float32)
+    age_h[~any_finite] = np.nan
     return latest, age_h, newest_end_ts
 
 
-def build_hod(values_stack: List[Tuple[int, np.ndarray]], lon2d: np.ndarray,
-              min_per_hour: int = 2):
-    if not values_stack:
-        raise ValueError("No granule data provided.")
-    H, W = values_stack[0][1].shape
-    hod_sum = [np.zeros((H, W), dtype=float) for _ in range(24)]
-    hod_cnt = [np.zeros((H, W), dtype=np.int32) for _ in range(24)]
-    hour_counts = [0 for _ in range(24)]
-
-    for end_ts, grid in values_stack:
-        local_hour = compute_local_hour(end_ts, lon2d)
-        valid_mask = np.isfinite(grid)
-        for h in range(24):
-            m = valid_mask & (local_hour == h)
-            if np.any(m):
-                hod_sum[h][m] += grid[m]
-                hod_cnt[h][m] += 1
-                hour_counts[h] += 1
-
-    hod_grids = []
+if njit is not None:
+    # no fastmath: it lets LLVM assume no NaN, which breaks the finite test
+    @njit(parallel=True, cache=True)
+    def _hod_accum(grids, local_hours, hod_sum, hod_cnt, seen):
+        N, H, W = grids.shape
+        for i in prange(H):  # rows are disjoint -> race-free
+            for g in range(N):
+                for j in range(W):
+                    v = grids[g, i, j]
+                    if np.isfinite(v):
+                        h = local_hours[g, i, j]
+                        hod_sum[h, i, j] += v
+                        hod_cnt[h, i, j] += 1
+                        seen[i, g, h] = True
+
+
+def build_hod(ts: np.ndarray, stack: np.ndarray, lon2d: np.ndarray,
+              min_per_hour: int = 2) -> Tuple[np.ndarray, List[int], List[bool]]:
+    N, H, W = stack.shape
+    lon_h, lon_h_floor = lon_hour_offsets(lon2d)
+    local_hours = np.empty((N, H, W), dtype=np.int8)
+    for g in range(N):
+        local_hours[g] = compute_local_hour(int(ts[g]), lon_h, lon_h_floor)
+
+    # 64-byte aligned so the accumulation loops get aligned vector loads/stores
+    hod_sum = aligned_zeros((24, H, W), np.float32)
+    hod_cnt = aligned_zeros((24, H, W), np.int32)
+
+    if njit is not None:
+        seen = np.zeros((H, N, 24), dtype=np.bool_)
+        _hod_accum(stack, local_hours, hod_sum, hod_cnt, seen)
+        hour_counts = seen.any(axis=0).sum(axis=0)
+    else:
+        # flat views: slot = local_hour * H*W + cell
+        n = H * W
+        sum_flat = hod_sum.reshape(-1)
+        cnt_flat = hod_cnt.reshape(-1)
+        hour_counts = np.zeros(24, dtype=np.int64)
+        cell = np.arange(n)
+        for g in range(N):
+            v = stack[g].ravel()
+            m = np.isfinite(v)
+            lh = local_hours[g].ravel()[m].astype(np.intp)
+            # each cell has exactly one local hour per granule -> slots are unique,
+            # so plain fancy-index += is a correct scatter-add (no np.add.at needed)
+            slot = lh * n + cell[m]
+            sum_flat[slot] += v[m]
+            cnt_flat[slot] += 1
+            hour_counts += np.bincount(lh, minlength=24) > 0
+
+    # Mean in place; hours where no cell reaches min_per_hour are only NaN-filled
+    mask = hod_cnt >= max(1, min_per_hour)
+    live = mask.any(axis=(1, 2))
+    hod = hod_sum
     for h in range(24):
-        out = np.full((H, W), np.nan, dtype=float)
-        mask = hod_cnt[h] >= min_per_hour
-        if np.any(mask):
-            out[mask] = hod_sum[h][mask] / hod_cnt[h][mask]
-        hod_grids.append(out)
-    return hod_grids, hour_counts
+        if not live[h]:
+            hod[h] = np.nan
+            continue
+        np.divide(hod[h], hod_cnt[h].astype(np.float32), out=hod[h], where=mask[h])
+        hod[h][~mask[h]] = np.nan
+    return hod, hour_counts.tolist(), live.tolist()
 
 
 def write_latest_json(out_path: str, meta: Dict[str, Any],
-                      latest: np.ndarray, age_h: np.ndarray) -> None:
-    latest_q = jsonable_2d(latest, ndigits=6)
-    age_q    = jsonable_2d(age_h, ndigits=2)
+                      latest: np.ndarray, age_h: np.ndarray,
+                      scale: Optional[float] = None) -> None:
+    latest_q = encode_grid(latest, 6, scale)
+    age_q    = encode_grid(age_h, 2, AGE_SCALE if scale is not None else None)
     payload = {
         "product": meta.get("product"),
         "unit": meta.get("unit"),
@@ -182,13 +409,24 @@ def write_latest_json(out_path: str, meta: Dict[str, Any],
         "generated_at": datetime.now(timezone.utc).strftime(ISO_FMT),
         "data": {"value": latest_q, "age_h": age_q}
     }
+    if scale is not None:
+        payload["encoding"] = {"value": encoding_info(scale),
+                               "age_h": encoding_info(AGE_SCALE)}
     ensure_dir(os.path.dirname(out_path))
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    write_json(out_path, payload)
+
+
+def _write_one_hour(out_dir: str, h: int, grid: Optional[np.ndarray], scale: Optional[float]) -> None:
+    # grid=None -> empty hour, written as a "data": null stub
+    payload = {"hour": h, "data": encode_grid(grid, 6, scale) if grid is not None else None}
+    if scale is not None:
+        payload.update(scale=scale, nodata=NODATA_I16)
+    write_json(os.path.join(out_dir, f"hour_{h:02d}.json"), payload)
 
 
 def write_hod_split(out_dir: str, meta: Dict[str, Any],
-                    hod_grids, hour_counts):
+                    hod_grids: np.ndarray, hour_counts, scale: Optional[float] = None,
+                    workers: int = 8, live: Optional[List[bool]] = None):
     ensure_dir(out_dir)
     meta_payload = {
         "product": meta.get("product"),
@@ -202,14 +440,15 @@ def write_hod_split(out_dir: str, meta: Dict[str, Any],
         "min_per_hour": meta.get("min_per_hour"),
         "hour_counts": hour_counts
     }
-    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
-        json.dump(meta_payload, f, ensure_ascii=False, separators=(",", ":"))
+    if scale is not None:
+        meta_payload["encoding"] = encoding_info(scale)
+    write_json(os.path.join(out_dir, "meta.json"), meta_payload)
 
-    for h in range(24):
-        grid_q = jsonable_2d(hod_grids[h], ndigits=6)
-        payload = {"hour": h, "data": grid_q}
-        with open(os.path.join(out_dir, f"hour_{h:02d}.json"), "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    # 24 independent files: encode + write them concurrently
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        list(ex.map(lambda h: _write_one_hour(out_dir, h,
+                                              hod_grids[h] if live is None or live[h] else None,
+                                              scale), range(24)))
 
 
 def main():
@@ -222,6 +461,12 @@ def main():
                     help="Window in hours to consider (default 72)")
     ap.add_argument("--min-per-hour", type=int, default=2,
                     help="Min per-cell samples required for HOD mean")
+    ap.add_argument("--workers", type=int, default=8,
+                    help="Threads used to load granule json files and write HOD files (default 8)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="Do not read/write the sanitized-grid cache (<product>/cache/*.npy)")
+    ap.add_argument("--quantize", action="store_true",
+                    help="Write grids as int16 with a per-product scale (phys = data / scale)")
     args = ap.parse_args()
 
     product = args.product
@@ -274,9 +519,9 @@ def main():
 
     # Infer grid from first granule
     first = load_json(granules[0][1])
-    if not first or "data" not in first:
+    data0 = granule_grid(first) if first else None
+    if data0 is None or data0.ndim != 2:
         sys.exit(f"Cannot read first granule json: {granules[0][1]}")
-    data0 = to_float_grid(first["data"])
     H, W = data0.shape
 
     lat = first.get("lat")
@@ -305,28 +550,57 @@ def main():
     newest_gid = None
     newest_end_ts = None
 
-    for end_ts, jpath, gid in granules:
-        g = load_json(jpath)
-        if not g or "data" not in g:
-            continue
-        grid = to_float_grid(g["data"])
-        if grid.shape != (H, W):
+    # Sanitized grids are cached as .npy under <product>/cache/<gid>.npy;
+    # a cache entry is used only if it is not older than its granule json.
+    cache_dir = None if args.no_cache else os.path.join(prod_dir, "cache")
+    if cache_dir:
+        ensure_dir(cache_dir)
+
+    def _load(item):
+        # sanitized cache -> raw .npy sidecar (tempo_to_json --npy-sidecar) -> json
+        _end_ts, jpath, gid = item
+        if cache_dir:
+            grid = load_npy_grid(os.path.join(cache_dir, f"{gid}.npy"), jpath, (H, W))
+            if grid is not None:
+                return grid, True
+        grid = load_npy_grid(jpath[:-5] + ".npy", jpath, (H, W))
+        if grid is not None:
+            return grid, False
+        return load_granule_grid(jpath, (H, W)), False
+
+    # Granules are independent: read/parse them concurrently (map keeps order).
+    # Sanitizing stays on this thread (numba parallel kernels are not re-entrant).
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        grids = list(ex.map(_load, granules))
+
+    for (end_ts, jpath, gid), (grid, cached) in zip(granules, grids):
+        if grid is None:
             continue
-        grid = sanitize_grid(grid, product)
+        if not cached:
+            grid = sanitize_grid(grid, product)
+            if cache_dir:
+                save_cached_grid(os.path.join(cache_dir, f"{gid}.npy"), grid)
+        # granules is sorted by end_ts and ex.map keeps its order, so values_stack
+        # is sorted oldest -> newest by construction (build_latest relies on it)
         values_stack.append((end_ts, grid))
         newest_gid = gid
         newest_end_ts = end_ts
+    del grids
+    if cache_dir:
+        prune_cache(cache_dir, {gid for _, _, gid in granules})
 
     if not values_stack:
         sys.exit("No usable grids found after loading.")
 
-    latest_grid, age_grid, newest_end_ts2 = build_latest(values_stack)
+    ts, stack = stack_granules(values_stack)
+    del values_stack
+    latest_grid, age_grid, newest_end_ts2 = build_latest(ts, stack)
     if newest_end_ts is None:
         newest_end_ts = newest_end_ts2
-    hod_grids, hour_counts = build_hod(values_stack, lon2d, min_per_hour=args.min_per_hour)
+    hod_grids, hour_counts, hod_live = build_hod(ts, stack, lon2d, min_per_hour=args.min_per_hour)
 
-    # Sanitize HOD as well (clamp/None)
-    hod_grids = [sanitize_grid(hg, product) for hg in hod_grids]
+    # Sanitize HOD as well (clamp/None) -- one call over the whole (24, H, W) block
+    hod_grids = sanitize_grid(hod_grids, product)
 
     fc_dir = os.path.join(prod_dir, "fc_support")
     meta_common = {
@@ -341,8 +615,11 @@ def main():
         "newest_end": (datetime.fromtimestamp(newest_end_ts, timezone.utc).strftime(ISO_FMT)
                        if newest_end_ts else None),
     }
-    write_latest_json(os.path.join(fc_dir, "latest.json"), meta_common, latest_grid, age_grid)
-    write_hod_split(os.path.join(fc_dir, "hod"), meta_common, hod_grids, hour_counts)
+    scale = SPEC[product]["scale"] if args.quantize else None
+    write_latest_json(os.path.join(fc_dir, "latest.json"), meta_common, latest_grid, age_grid,
+                      scale=scale)
+    write_hod_split(os.path.join(fc_dir, "hod"), meta_common, hod_grids, hour_counts,
+                    scale=scale, workers=args.workers, live=hod_live)
     # print("Summaries written:", os.path.join(fc_dir, "latest.json"), os.path.join(fc_dir, "hod"))
 
 
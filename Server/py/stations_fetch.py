@@ -13,9 +13,16 @@ Author: climatewise.app
 """
 
 import os, sys, json, time, pathlib, logging, requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime, timedelta, timezone
 
+try:
+    import orjson  # fast C serializer (utf-8 bytes)
+except ImportError:
+    orjson = None
+
 # =========================
 # CONFIG
 # =========================
@@ -56,6 +63,7 @@ ROUND_DEDUP = 4
 DISABLE_OPENAQ = os.getenv("DISABLE_OPENAQ", "false").lower() in ("1", "true", "yes")
 OPENAQ_MAX_SENSORS_PER_RUN = int(os.getenv("OPENAQ_MAX_SENSORS_PER_RUN", "50"))   # non-US per param
 PER_HOUR_TIME_BUDGET = int(os.getenv("PER_HOUR_TIME_BUDGET", "120"))              # seconds per hour
+OPENAQ_WORKERS = int(os.getenv("OPENAQ_WORKERS", "16"))                           # parallel sensor requests
 
 # Optional: backfill inside the US if AirNow looks thin (per param per hour)
 OPENAQ_US_BACKFILL = os.getenv("OPENAQ_US_BACKFILL", "false").lower() in ("1", "true", "yes")
@@ -78,15 +86,30 @@ ERR_LOG = logging.getLogger("stations_errors")
 efh = logging.FileHandler(LOG_DIR / "stations_errors.log", encoding="utf-8")
 efh.setFormatter(fmt); ERR_LOG.addHandler(efh); ERR_LOG.setLevel(logging.WARNING)
 
+# =========================
+# HTTP
+# =========================
+
+# One pooled session for all OpenAQ calls (keep-alive; sized for the worker threads)
+OPENAQ_SESSION = requests.Session()
+OPENAQ_SESSION.headers.update({"X-API-Key": OPENAQ_API_KEY})
+OPENAQ_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(1, OPENAQ_WORKERS)))
+
 # =========================
 # FILE UTILS
 # =========================
 
-def atomic_write_json(path: pathlib.Path, obj: Any) -> None:
+def atomic_write_json(path: pathlib.Path, obj: Any, indent: bool = True) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0))
+    else:
+        with tmp.open("w", encoding="utf-8") as f:
+            if indent:
+                json.dump(obj, f, ensure_ascii=False, indent=2)
+            else:
+                json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
     tmp.replace(path)
 
 def load_json(path: pathlib.Path) -> Optional[Any]:
@@ -153,14 +176,16 @@ def refresh_sensors_geojson_if_needed() -> List[Dict[str, Any]]:
             return gj["features"]
 
     logger.info("Refreshing sensors.geojson via OpenAQ locations …")
-    headers = {"X-API-Key": OPENAQ_API_KEY}
     page = 1
     features: List[Dict[str, Any]] = []
+    # Keep only sensors active within the last 72 hours; datetimeLast is per location,
+    # so inactive locations are dropped before any of their sensor features are built
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=RETENTION_HOURS)
 
     while True:
         params = {"bbox": BBOX_NA, "page": page, "limit": OPENAQ_PAGE_LIMIT}
         try:
-            r = requests.get(OPENAQ_LOCATIONS, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            r = OPENAQ_SESSION.get(OPENAQ_LOCATIONS, params=params, timeout=REQUEST_TIMEOUT)
         except Exception as e:
             ERR_LOG.error(f"OpenAQ locations page {page} error: {e}")
             break
@@ -178,51 +203,53 @@ def refresh_sensors_geojson_if_needed() -> List[Dict[str, Any]]:
             lat, lon = coords.get("latitude"), coords.get("longitude")
             if lat is None or lon is None:
                 continue
+            last = (loc.get("datetimeLast") or {}).get("utc")
+            if not last:
+                continue
+            try:
+                if datetime.fromisoformat(last.replace("Z", "+00:00")) < cutoff:
+                    continue
+            except Exception:
+                continue
             sensors = loc.get("sensors") or []
+            geometry = None
+            loc_props = None
             for s in sensors:
-                param = ((s.get("parameter") or {}).get("name") or "").lower()
+                param_obj = s.get("parameter") or {}
+                param = (param_obj.get("name") or "").lower()
                 if param not in PARAMS:
                     continue
-                features.append({
-                    "type": "Feature",
-                    "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
-                    "properties": {
-                        "sensorsId": s.get("id"),
+                if loc_props is None:
+                    geometry = {"type": "Point", "coordinates": [float(lon), float(lat)]}
+                    loc_props = {
                         "locationsId": loc.get("id"),
                         "name": loc.get("name"),
-                        "parameter": param,
-                        "units": (s.get("parameter") or {}).get("units"),
                         "provider": (loc.get("provider") or {}).get("name"),
                         "timezone": loc.get("timezone"),
                         "datetimeFirst": (loc.get("datetimeFirst") or {}).get("utc"),
-                        "datetimeLast": (loc.get("datetimeLast") or {}).get("utc"),
+                        "datetimeLast": last,
                         "country": ((loc.get("country") or {}).get("code")),
                     }
+                features.append({
+                    "type": "Feature",
+                    "geometry": geometry,
+                    "properties": {
+                        "sensorsId": s.get("id"),
+                        **loc_props,
+                        "parameter": param,
+                        "units": param_obj.get("units"),
+                    }
                 })
 
-        logger.info(f"OpenAQ locations page {page} parsed: +{len(results)} locations; sensors so far: {len(features)}")
+        logger.info(f"OpenAQ locations page {page} parsed: +{len(results)} locations; active sensors so far: {len(features)}")
         page += 1
         if len(results) < OPENAQ_PAGE_LIMIT:
             break
 
-    # Keep only sensors active within the last 72 hours
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=RETENTION_HOURS)
-    active = []
-    for ft in features:
-        last = ft["properties"].get("datetimeLast")
-        if not last:
-            continue
-        try:
-            last_dt = datetime.fromisoformat(last.replace("Z", "+00:00"))
-        except Exception:
-            continue
-        if last_dt >= cutoff:
-            active.append(ft)
-
-    geojson = {"type": "FeatureCollection", "features": active}
-    atomic_write_json(geojson_path, geojson)
-    logger.info(f"Wrote sensors.geojson with {len(active)} active NO2/O3 sensors")
-    return active
+    geojson = {"type": "FeatureCollection", "features": features}
+    atomic_write_json(geojson_path, geojson, indent=False)  # machine-read; compact
+    logger.info(f"Wrote sensors.geojson with {len(features)} active NO2/O3 sensors")
+    return features
 
 def pick_openaq_sensor_ids(features: List[Dict[str, Any]], param: str, *, country_filter: Optional[str], limit: int) -> List[int]:
     ids = []
@@ -292,21 +319,25 @@ def fetch_airnow_hour(hour_start: datetime, bbox: str, parameters_csv: str) -> L
         })
     return out
 
-def fetch_openaq_hours_for_sensors(sensor_ids: List[int], hour_start: datetime) -> List[Dict[str, Any]]:
-    headers = {"X-API-Key": OPENAQ_API_KEY}
+def fetch_openaq_hours_for_sensors(sensor_ids: List[int], hour_start: datetime,
+                                   deadline: Optional[float] = None) -> List[Dict[str, Any]]:
     date_from = hour_start.replace(tzinfo=timezone.utc).isoformat().replace("+00:00","Z")
     date_to = (hour_start + timedelta(hours=1)).replace(tzinfo=timezone.utc).isoformat().replace("+00:00","Z")
-    out: List[Dict[str, Any]] = []
-    for i, sid in enumerate(sensor_ids, 1):
+
+    def _fetch_one(sid: int) -> List[Dict[str, Any]]:
+        # Sensors not started before the deadline are skipped (per-hour time budget)
+        if deadline is not None and time.time() > deadline:
+            return []
         url = OPENAQ_SENSORS_HOURS.format(sensor_id=sid)
         params = {"date_from": date_from, "date_to": date_to, "limit": OPENAQ_PAGE_LIMIT}
         try:
-            r = requests.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            r = OPENAQ_SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
         except Exception as e:
-            ERR_LOG.warning(f"OpenAQ sensors/{sid}/hours error: {e}"); continue
+            ERR_LOG.warning(f"OpenAQ sensors/{sid}/hours error: {e}"); return []
         if r.status_code != 200:
-            ERR_LOG.info(f"OpenAQ sensors/{sid}/hours HTTP {r.status_code}: {r.text[:160]}"); continue
+            ERR_LOG.info(f"OpenAQ sensors/{sid}/hours HTTP {r.status_code}: {r.text[:160]}"); return []
         payload = r.json()
+        rows: List[Dict[str, Any]] = []
         for row in payload.get("results", []):
             val = row.get("value")
             param_obj = row.get("parameter") or {}
@@ -323,12 +354,18 @@ def fetch_openaq_hours_for_sensors(sensor_ids: List[int], hour_start: datetime)
             if units == "PPM":  # normalize ppm → ppb
                 value *= 1000.0
                 units = "PPB"
-            out.append({
+            rows.append({
                 "ts": date_from, "parameter": param, "value": value, "units": units or "PPB",
                 "lat": float(lat), "lon": float(lon), "provider": "OpenAQ",
             })
-        if i % 25 == 0:
-            logger.info(f"OpenAQ progress: {i}/{len(sensor_ids)} sensors for hour {date_from}")
+        return rows
+
+    out: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=max(1, OPENAQ_WORKERS)) as ex:
+        for i, rows in enumerate(ex.map(_fetch_one, sensor_ids), 1):
+            out.extend(rows)
+            if i % 25 == 0:
+                logger.info(f"OpenAQ progress: {i}/{len(sensor_ids)} sensors for hour {date_from}")
     return out
 
 # =========================
@@ -336,18 +373,16 @@ def fetch_openaq_hours_for_sensors(sensor_ids: List[int], hour_start: datetime)
 # =========================
 
 def dedup_merge_pref_airnow(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # AirNow rows go first, so the first row kept per (ts, parameter, cell) key is AirNow
+    # whenever both providers report it; no per-row provider comparison needed.
+    airnow = [r for r in records if r.get("provider") == "AirNow"]
+    others = [r for r in records if r.get("provider") != "AirNow"]
     best: Dict[Tuple[str,str,float,float], Dict[str,Any]] = {}
-    for rec in records:
-        key = (rec["ts"], rec["parameter"],
-               round(float(rec["lat"]), ROUND_DEDUP),
-               round(float(rec["lon"]), ROUND_DEDUP))
-        cur = best.get(key)
-        if cur is None:
-            best[key] = rec
-        else:
-            # Prefer AirNow over OpenAQ when both exist for the same cell/time/parameter
-            if cur.get("provider") == "OpenAQ" and rec.get("provider") == "AirNow":
-                best[key] = rec
+    setdefault = best.setdefault
+    for rec in airnow + others:
+        setdefault((rec["ts"], rec["parameter"],
+                    round(rec["lat"], ROUND_DEDUP),
+                    round(rec["lon"], ROUND_DEDUP)), rec)
     return list(best.values())
 
 def save_hour(param: str, hour_start: datetime, records: List[Dict[str, Any]]) -> None:
@@ -412,7 +447,8 @@ def main():
             for p in PARAMS:
                 sids = non_us_ids.get(p) or []
                 if not sids: continue
-                part = fetch_openaq_hours_for_sensors(sids, hour_start)
+                part = fetch_openaq_hours_for_sensors(sids, hour_start,
+                                                      deadline=start_ts + PER_HOUR_TIME_BUDGET)
                 openaq_records_all.extend(part)
                 logger.info(f"OpenAQ(non-US) {ts} {p}: {len(part)} rows")
                 if time.time() - start_ts > PER_HOUR_TIME_BUDGET:
@@ -437,7 +473,8 @@ def main():
                 if airnow_count < US_BACKFILL_MIN_COUNT:
                     logger.info(f"US backfill {ts} {p}: AirNow count={airnow_count} < {US_BACKFILL_MIN_COUNT} → calling OpenAQ(US)")
                     sids_us = us_ids.get(p) or []
-                    part_us = fetch_openaq_hours_for_sensors(sids_us, hour_start)
+                    part_us = fetch_openaq_hours_for_sensors(sids_us, hour_start,
+                                                             deadline=start_ts + PER_HOUR_TIME_BUDGET)
                     merged = dedup_merge_pref_airnow(existing + part_us)
                     save_hour(p, hour_start, merged)
                     update_index(p)
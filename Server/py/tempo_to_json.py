@@ -14,14 +14,16 @@ Example run:
 """
 
 import argparse
+import base64
 import json
-import math
 import os
 import re
 import sys
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 try:
     import numpy as np
@@ -35,6 +37,16 @@ except Exception:
     print("ERROR: netCDF4 is required. pip install netCDF4", file=sys.stderr)
     raise
 
+try:
+    import orjson  # fast C serializer (native numpy); stdlib json is the fallback
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange  # optional JIT for the coarse-grid kernel
+except ImportError:
+    njit = None
+
 
 # ---------- Constants & Product Map ----------
 
@@ -51,6 +63,9 @@ LON_CANDIDATES = ["longitude", "geolocation/longitude"]
 ABSURD_NEG = -1e20  # anything less than this → NaN
 ABSURD_POS =  1e20  # anything greater than this for molecule/DU units → NaN
 
+# In-memory LRU of normalized product grids, in MB (0 = off); helps re-runs/retries in one process
+TEMPO_NC_CACHE_MB = int(os.getenv("TEMPO_NC_CACHE", "0") or 0)
+
 
 # ---------- Utility helpers ----------
 
@@ -90,10 +105,33 @@ def read_json(path: str) -> Optional[dict]:
         return None
 
 
-def write_json_atomic(path: str, payload: dict):
+def _json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def write_json_atomic(path: str, payload: dict, rows: Optional[Iterable[list]] = None):
+    """Write payload atomically; if `rows` is given it is streamed as a trailing "data" list."""
+    tmp = path + ".part"
+    with open(tmp, "wb") as f:
+        if rows is None:
+            f.write(_json_bytes(payload))
+        else:
+            head = _json_bytes(payload)
+            f.write(head[:-1] + (b"," if payload else b"") + b'"data":[')
+            for i, row in enumerate(rows):
+                if i:
+                    f.write(b",")
+                f.write(_json_bytes(row))
+            f.write(b"]}")
+    os.replace(tmp, path)
+
+
+def write_npy_atomic(path: str, arr: np.ndarray):
     tmp = path + ".part"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
     os.replace(tmp, path)
 
 
@@ -138,8 +176,10 @@ def time_overlap_score(a0: Optional[str], a1: Optional[str], b0: Optional[str],
     return -gap
 
 
-def select_best_cldo4(in_root: str, target_t0: Optional[str], target_t1: Optional[str]) -> Optional[Tuple[str, dict]]:
-    cld_idx = load_input_index(in_root, "cldo4")
+def select_best_cldo4(in_root: str, target_t0: Optional[str], target_t1: Optional[str],
+                      cld_idx: Optional[Dict[str, dict]] = None) -> Optional[Tuple[str, dict]]:
+    if cld_idx is None:
+        cld_idx = load_input_index(in_root, "cldo4")
     best_gid, best_meta, best_score = None, None, -1e12
     for gid, meta in cld_idx.items():
         t0 = (meta.get("subset_time") or [meta.get("t0"), meta.get("t1")])[0]
@@ -179,18 +219,41 @@ def read_axis(ds: Dataset, candidates: List[str]) -> np.ndarray:
 def read_main_array(ds: Dataset, var_path: str) -> Tuple[np.ndarray, str]:
     v = _get_var_by_path(ds, var_path)
     units = getattr(v, "units", "") or ""
-    data = np.array(v[...], dtype=np.float64)
+    data = np.asarray(v[...])  # native dtype (TEMPO L3 fields are float32)
+    if not np.issubdtype(data.dtype, np.floating):
+        data = data.astype(np.float64)
+    # auto-masking is off (see open_dataset): map _FillValue to NaN once here
+    fill = getattr(v, "_FillValue", None)
+    if fill is not None:
+        data[data == fill] = np.nan
     if data.ndim == 3 and data.shape[0] == 1:
         data = data[0]
     return data, units
 
 
+def open_dataset(path: str) -> Dataset:
+    """Open read-only with auto-masking off: variables come back as plain ndarrays."""
+    ds = Dataset(path, mode="r")
+    ds.set_auto_mask(False)
+    return ds
+
+
+def _nanmean_axis(a: np.ndarray, axis: int) -> np.ndarray:
+    """np.nanmean along one axis from a single masked sum (all-NaN lines -> NaN, no warning)."""
+    valid = np.isfinite(a)
+    sums = np.where(valid, a, 0.0).sum(axis=axis, dtype=np.float64)
+    cnts = valid.sum(axis=axis)
+    out = np.full(sums.shape, np.nan)
+    np.divide(sums, cnts, out=out, where=cnts > 0)
+    return out
+
+
 def axes_from_latlon(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     lat_arr = np.array(lat)
     lon_arr = np.array(lon)
     if lat_arr.ndim == 2 and lon_arr.ndim == 2:
-        lat_1d = np.nanmean(lat_arr, axis=1)
-        lon_1d = np.nanmean(lon_arr, axis=0)
+        lat_1d = _nanmean_axis(lat_arr, 1)
+        lon_1d = _nanmean_axis(lon_arr, 0)
     else:
         lat_1d = lat_arr.ravel()
         lon_1d = lon_arr.ravel()
@@ -210,11 +273,25 @@ def normalize_lon_and_align(lon1d: np.ndarray,
                             arr2d: np.ndarray,
                             also_return_order: bool = False):
     lon_norm = ((lon1d.astype(float) + 180.0) % 360.0) - 180.0
-    order = np.argsort(lon_norm)
-    lon_sorted = lon_norm[order]
     if arr2d.ndim != 2 or arr2d.shape[1] != lon1d.size:
         raise ValueError("arr2d must be (H,W) aligned with lon (W).")
-    arr_sorted = arr2d[:, order]
+    # An ascending native grid stays sorted after wrapping, or splits into two
+    # ascending runs at the dateline: identity / one rotation instead of argsort
+    # NaN never shows up as a break, so only NaN-free axes take the fast paths
+    has_nan = bool(np.isnan(lon_norm).any())
+    breaks = np.flatnonzero(np.diff(lon_norm) < 0)
+    if breaks.size == 0 and not has_nan:
+        order = np.arange(lon_norm.size)
+        lon_sorted, arr_sorted = lon_norm, arr2d
+    elif breaks.size == 1 and lon_norm[-1] <= lon_norm[0] and not has_nan:
+        k = int(breaks[0]) + 1
+        order = np.r_[k:lon_norm.size, 0:k]
+        lon_sorted = np.concatenate((lon_norm[k:], lon_norm[:k]))
+        arr_sorted = np.concatenate((arr2d[:, k:], arr2d[:, :k]), axis=1)
+    else:
+        order = np.argsort(lon_norm)
+        lon_sorted = lon_norm[order]
+        arr_sorted = arr2d[:, order]
     if also_return_order:
         return lon_sorted, arr_sorted, order
     return lon_sorted, arr_sorted
@@ -227,13 +304,35 @@ def block_reduce_mean(arr: np.ndarray, by_y: int, by_x: int) -> np.ndarray:
     if H == 0 or W == 0:
         raise ValueError(f"Block size too large for data shape {arr.shape}")
     d = arr[:H, :W].reshape(H // by_y, by_y, W // by_x, by_x)
-    return np.nanmean(np.nanmean(d, axis=3), axis=1)
+    # one pass: sum and count of finite cells per block (all-empty block -> NaN)
+    valid = np.isfinite(d)
+    sums = np.where(valid, d, 0.0).sum(axis=(1, 3), dtype=np.float64)  # accumulate wide
+    cnts = valid.sum(axis=(1, 3))
+    # divide straight into the output-dtype buffer (no where/astype copies)
+    out = np.full(sums.shape, np.nan, dtype=arr.dtype)
+    np.divide(sums, cnts, out=out, where=cnts > 0, casting="same_kind")
+    return out
+
+
+def _axis_index(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """np.searchsorted(src, dst) for an ascending axis, in closed form when src is uniform."""
+    n = len(src)
+    if n > 1:
+        step = (src[-1] - src[0]) / (n - 1)
+        if step > 0 and np.isfinite(dst).all():
+            i = np.clip(np.ceil((dst - src[0]) / step), 0, n).astype(np.intp)
+            # must satisfy src[i-1] < dst <= src[i]; off by one (or non-uniform) -> exact search
+            lo_ok = (i == 0) | (src[np.maximum(i - 1, 0)] < dst)
+            hi_ok = (i == n) | (src[np.minimum(i, n - 1)] >= dst)
+            if lo_ok.all() and hi_ok.all():
+                return i
+    return np.searchsorted(src, dst)
 
 
 def reindex_to(lat_src: np.ndarray, lon_src: np.ndarray, src: np.ndarray,
                lat_dst: np.ndarray, lon_dst: np.ndarray) -> np.ndarray:
-    iy = np.searchsorted(lat_src, lat_dst)
-    ix = np.searchsorted(lon_src, lon_dst)
+    iy = _axis_index(lat_src, lat_dst)
+    ix = _axis_index(lon_src, lon_dst)
     iy = np.clip(iy, 0, len(lat_src)-1)
     ix = np.clip(ix, 0, len(lon_src)-1)
     return src[iy[:, None], ix[None, :]]
@@ -241,6 +340,39 @@ def reindex_to(lat_src: np.ndarray, lon_src: np.ndarray, src: np.ndarray,
 
 # ---------- Core conversion ----------
 
+# Normalized CLDO4 grids keyed by (in_root, cld_gid); per process, oldest entry evicted.
+# A full-domain grid is ~90 MB and every --workers process holds its own copy, so keep it
+# small: hits come from neighbouring granules matching the same CLDO4 granule.
+_CLD_CACHE: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+_CLD_CACHE_MAX = 2
+
+
+def _load_cld_grid(in_root: str, cld_gid: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """(lat ascending, lon in [-180, 180) sorted, cloud fraction) for a CLDO4 granule, cached."""
+    key = (in_root, cld_gid)
+    hit = _CLD_CACHE.get(key)
+    if hit is not None:
+        return hit
+    cld_dir, _ = product_paths(in_root, "cldo4")
+    cld_path = nc_path_for_gid(cld_dir, "cldo4", cld_gid)
+    if not os.path.isfile(cld_path):
+        return None
+    with open_dataset(cld_path) as cds:
+        cf_raw, _u = read_main_array(cds, PRODUCTS["cldo4"]["var"])
+        cf_raw = np.squeeze(cf_raw)
+        latc_raw = read_axis(cds, LAT_CANDIDATES)
+        lonc_raw = read_axis(cds, LON_CANDIDATES)
+    latc1, lonc1 = axes_from_latlon(latc_raw, lonc_raw)
+    if latc1[0] > latc1[-1]:
+        latc1 = latc1[::-1]
+        cf_raw = cf_raw[::-1, :]
+    lonc1, cf_raw = normalize_lon_and_align(lonc1, cf_raw)
+    while len(_CLD_CACHE) >= _CLD_CACHE_MAX:
+        _CLD_CACHE.pop(next(iter(_CLD_CACHE)))
+    _CLD_CACHE[key] = (latc1, lonc1, cf_raw)
+    return _CLD_CACHE[key]
+
+
 def _sanitize_array_for_product(arr: np.ndarray, product: str) -> np.ndarray:
     """Hard sanitization per product (NaN/Inf/negatives/outliers/clamp to logical range)."""
     spec = PRODUCTS[product]
@@ -248,24 +380,123 @@ def _sanitize_array_for_product(arr: np.ndarray, product: str) -> np.ndarray:
     hard_min   = spec["hard_min"]
     hard_max   = spec["hard_max"]
 
-    A = arr.astype(float, copy=True)
+    dtype = np.result_type(arr.dtype, np.float32)
+
+    # One combined invalid mask: NaN/Inf, extreme outliers, and (for most
+    # products) non-positive values
+    with np.errstate(invalid="ignore"):
+        bad = ~np.isfinite(arr) | (arr < ABSURD_NEG) | (arr > ABSURD_POS)
+        if not allow_zero:
+            bad |= arr <= 0.0
+        # Logical range: clamp to [hard_min, hard_max] (e.g., CLDO4 minimum is 0)
+        A = np.where(bad, np.nan, np.clip(arr, hard_min if allow_zero else None, hard_max))
+
+    return A.astype(dtype, copy=False)
+
+
+if njit is not None:
+    # no fastmath: it lets LLVM assume no NaN, which breaks the finite/NaN tests
+    @njit(parallel=True, cache=True)
+    def _coarse_kernel(arr, cf, use_cloud, cloud_th, by_y, by_x,
+                       allow_zero, hard_min, hard_max, absurd_neg, absurd_pos):
+        """Block mean + cloud mask + product sanitization in one pass (same rules as numpy path)."""
+        Ho = arr.shape[0] // by_y
+        Wo = arr.shape[1] // by_x
+        out = np.empty((Ho, Wo), dtype=arr.dtype)
+        for i in prange(Ho):
+            for j in range(Wo):
+                s = 0.0
+                n = 0
+                for y in range(i * by_y, (i + 1) * by_y):
+                    for x in range(j * by_x, (j + 1) * by_x):
+                        v = arr[y, x]
+                        if np.isfinite(v):
+                            s += v
+                            n += 1
+                if n == 0:
+                    out[i, j] = np.nan
+                    continue
+                m = s / n
+                if use_cloud:
+                    c = min(max(cf[i, j], 0.0), 1.0)
+                    if c > cloud_th:  # NaN cloud fraction never masks
+                        out[i, j] = np.nan
+                        continue
+                if not np.isfinite(m) or m < absurd_neg or m > absurd_pos:
+                    m = np.nan
+                elif not allow_zero:
+                    if m <= 0.0:
+                        m = np.nan
+                elif m < hard_min:
+                    m = hard_min
+                if m > hard_max:
+                    m = hard_max
+                out[i, j] = m
+        return out
+
+
+_NC_CACHE: "OrderedDict[Tuple[str, str, int], Tuple[np.ndarray, str, np.ndarray, np.ndarray]]" = OrderedDict()
+_NC_CACHE_BYTES = 0
+
+
+def _load_product_grid(nc_path: str, var_path: str) -> Optional[Tuple[np.ndarray, str, np.ndarray, np.ndarray]]:
+    """(arr, units, lat1d, lon1d) with lat ascending and lon in [-180, 180); None if arr is not 2D.
+
+    Results are kept in a byte-bounded LRU when TEMPO_NC_CACHE (MB) is set; cached
+    arrays are read-only.
+    """
+    global _NC_CACHE_BYTES
+    key = (nc_path, var_path, os.stat(nc_path).st_mtime_ns)
+    hit = _NC_CACHE.get(key)
+    if hit is not None:
+        _NC_CACHE.move_to_end(key)
+        return hit
+
+    with open_dataset(nc_path) as ds:
+        arr, units = read_main_array(ds, var_path)
+        lat_raw = read_axis(ds, LAT_CANDIDATES)
+        lon_raw = read_axis(ds, LON_CANDIDATES)
 
-    # NaN/Inf → NaN
-    A[~np.isfinite(A)] = np.nan
+    arr = np.squeeze(arr)
+    if arr.ndim != 2:
+        return None
 
-    # Remove extreme outliers
-    A[A < ABSURD_NEG] = np.nan
-    A[A > ABSURD_POS] = np.nan
+    lat1d, lon1d = axes_from_latlon(lat_raw, lon_raw)
 
-    # Logical minimum (for most products negative values are invalid)
-    if not allow_zero:
-        A[A <= 0.0] = np.nan
-    else:
-        A[A < hard_min] = hard_min  # e.g., CLDO4 minimum is 0
-    # Logical maximum
-    A[A > hard_max] = hard_max
+    # Latitude direction: if descending, reverse both axis and data
+    if lat1d[0] > lat1d[-1]:
+        lat1d = lat1d[::-1]
+        arr = arr[::-1, :]
+
+    # Normalize longitude and reorder columns
+    lon1d, arr = normalize_lon_and_align(lon1d, arr)
+    grid = (arr, units, lat1d, lon1d)
+
+    limit = TEMPO_NC_CACHE_MB * 1024 * 1024
+    nbytes = arr.nbytes + lat1d.nbytes + lon1d.nbytes
+    if 0 < nbytes <= limit:
+        arr.flags.writeable = False
+        while _NC_CACHE and _NC_CACHE_BYTES + nbytes > limit:
+            _k, old = _NC_CACHE.popitem(last=False)
+            _NC_CACHE_BYTES -= old[0].nbytes + old[2].nbytes + old[3].nbytes
+        _NC_CACHE[key] = grid
+        _NC_CACHE_BYTES += nbytes
+    return grid
 
-    return A
+
+# Rounded coarse-axis lists keyed by the axis bytes; granules of a product share them
+_AXIS_LIST_CACHE: Dict[bytes, list] = {}
+
+
+def _axis_list(axis: np.ndarray) -> list:
+    axis = np.ascontiguousarray(axis, dtype=np.float64)
+    key = axis.tobytes()
+    hit = _AXIS_LIST_CACHE.get(key)
+    if hit is None:
+        if len(_AXIS_LIST_CACHE) >= 32:
+            _AXIS_LIST_CACHE.clear()
+        hit = _AXIS_LIST_CACHE[key] = axis.round(6).tolist()
+    return hit
 
 
 def convert_nc_to_json(
@@ -276,9 +507,13 @@ def convert_nc_to_json(
     cloud_th: Optional[float] = 0.3,
     dry_run: bool = False,
     verbose: bool = False,
+    npy_sidecar: bool = False,
+    meta: Optional[dict] = None,
+    cld_idx: Optional[Dict[str, dict]] = None,
+    data_b64: bool = False,
 ) -> Optional[Tuple[str, int]]:
+    # jdir is created once by sync_product (callers converting directly must create it)
     pdir, jdir = product_paths(in_root, product)
-    ensure_dir(jdir)
 
     nc_path = nc_path_for_gid(pdir, product, gid)
     if not os.path.isfile(nc_path):
@@ -286,34 +521,20 @@ def convert_nc_to_json(
             print(f"[{product}] NC not found for {gid}: {nc_path}")
         return None
 
-    # Times from input index
-    inp_idx = load_input_index(in_root, product)
-    meta = inp_idx.get(gid, {})
+    # Times from input index (callers looping over gids pass the entry in)
+    if meta is None:
+        meta = load_input_index(in_root, product).get(gid, {})
     t0 = (meta.get("subset_time") or [meta.get("t0"), meta.get("t1")])[0]
     t1 = (meta.get("subset_time") or [meta.get("t0"), meta.get("t1")])[-1]
     issued = mid_time_iso(t0, t1) or now_utc_iso()
 
-    # Read data and axes
-    with Dataset(nc_path, mode="r") as ds:
-        arr, units_from_nc = read_main_array(ds, PRODUCTS[product]["var"])
-        lat_raw = read_axis(ds, LAT_CANDIDATES)
-        lon_raw = read_axis(ds, LON_CANDIDATES)
-
-    arr = np.squeeze(arr)
-    if arr.ndim != 2:
+    # Read data and axes (lat ascending, lon normalized)
+    grid = _load_product_grid(nc_path, PRODUCTS[product]["var"])
+    if grid is None:
         if verbose:
-            print(f"[{product}] Unexpected data ndim={arr.ndim} for {gid}, skipping.")
+            print(f"[{product}] Unexpected data ndim for {gid}, skipping.")
         return None
-
-    lat1d, lon1d = axes_from_latlon(lat_raw, lon_raw)
-
-    # Latitude direction: if descending, reverse both axis and data
-    if lat1d[0] > lat1d[-1]:
-        lat1d = lat1d[::-1]
-        arr = arr[::-1, :]
-
-    # Normalize longitude and reorder columns
-    lon1d, arr = normalize_lon_and_align(lon1d, arr)
+    arr, units_from_nc, lat1d, lon1d = grid
 
     # Compute native step and block factors
     try:
@@ -335,49 +556,53 @@ def convert_nc_to_json(
         return None
 
     arr_trim = arr[:Hc, :Wc]
-    coarse = block_reduce_mean(arr_trim, by_y, by_x).astype(np.float64)
 
     # Coarse axes derived from native axes
     lat_c = lat1d[:Hc].reshape(Hc // by_y, by_y).mean(axis=1)
     lon_c = lon1d[:Wc].reshape(Wc // by_x, by_x).mean(axis=1)
 
+    # Cloud fraction on the coarse grid (only depends on lat_c/lon_c)
+    cf_on_product = None
+
     # Cloud mask (if enabled and product is not the cloud itself)
     if PRODUCTS[product]["uses_cloud"] and cloud_th is not None and cloud_th >= 0:
-        sel = select_best_cldo4(in_root, t0, t1)
+        sel = select_best_cldo4(in_root, t0, t1, cld_idx)
         if sel:
             cld_gid, _ = sel
-            cld_dir, _ = product_paths(in_root, "cldo4")
-            cld_path = nc_path_for_gid(cld_dir, "cldo4", cld_gid)
-            if os.path.isfile(cld_path):
-                with Dataset(cld_path, mode="r") as cds:
-                    cf_raw, _u = read_main_array(cds, PRODUCTS["cldo4"]["var"])
-                    cf_raw = np.squeeze(cf_raw)
-                    latc_raw = read_axis(cds, LAT_CANDIDATES)
-                    lonc_raw = read_axis(cds, LON_CANDIDATES)
-                    latc1, lonc1 = axes_from_latlon(latc_raw, lonc_raw)
-                    if latc1[0] > latc1[-1]:
-                        latc1 = latc1[::-1]
-                        cf_raw = cf_raw[::-1, :]
-                    lonc1, cf_raw = normalize_lon_and_align(lonc1, cf_raw)
-                    cf_on_product = reindex_to(latc1, lonc1, cf_raw, lat_c, lon_c)
-                    # **Sanitize CF into [0..1]**
-                    cf_on_product = np.clip(cf_on_product, 0.0, 1.0)
-                    coarse = np.where(cf_on_product > float(cloud_th), np.nan, coarse)
-
-    # **Hard sanitization based on product constraints**
-    coarse = _sanitize_array_for_product(coarse, product)
+            cld = _load_cld_grid(in_root, cld_gid)
+            if cld is not None:
+                latc1, lonc1, cf_raw = cld
+                cf_on_product = reindex_to(latc1, lonc1, cf_raw, lat_c, lon_c)
+
+    if njit is not None:
+        spec = PRODUCTS[product]
+        use_cloud = cf_on_product is not None
+        coarse = _coarse_kernel(
+            arr_trim,
+            np.ascontiguousarray(cf_on_product, dtype=np.float64) if use_cloud else np.empty((0, 0)),
+            use_cloud, float(cloud_th) if use_cloud else 0.0, by_y, by_x,
+            bool(spec["allow_zero"]), float(spec["hard_min"]), float(spec["hard_max"]),
+            ABSURD_NEG, ABSURD_POS)
+    else:
+        coarse = block_reduce_mean(arr_trim, by_y, by_x)
+        if cf_on_product is not None:
+            # **Sanitize CF into [0..1]**
+            cf_on_product = np.clip(cf_on_product, 0.0, 1.0)
+            coarse = np.where(cf_on_product > float(cloud_th), np.nan, coarse)
+        # **Hard sanitization based on product constraints**
+        coarse = _sanitize_array_for_product(coarse, product)
 
     # bbox from coarse axes
     south = float(np.nanmin(lat_c)); north = float(np.nanmax(lat_c))
     west  = float(np.nanmin(lon_c)); east  = float(np.nanmax(lon_c))
 
     Hout, Wout = coarse.shape
-    lat_list = np.asarray(lat_c).round(6).tolist()
-    lon_list = np.asarray(lon_c).round(6).tolist()
+    lat_list = _axis_list(lat_c)
+    lon_list = _axis_list(lon_c)
 
     units = units_from_nc or PRODUCTS[product]["unit_hint"]
 
-    # **Output uses None (not NaN)**
+    # "data" (None, not NaN) is streamed row by row by write_json_atomic (or data_b64)
     payload = {
         "product": product,
         "source_gid": gid,
@@ -391,17 +616,33 @@ def convert_nc_to_json(
         "cloud_th": float(cloud_th) if (PRODUCTS[product]["uses_cloud"] and cloud_th is not None) else None,
         "lat": lat_list,
         "lon": lon_list,
-        "data": [[(None if (not math.isfinite(x)) else float(round(float(x), 6))) for x in row] for row in coarse.tolist()],
     }
-
     out_path = json_path_for_gid(jdir, product, gid)
     if dry_run:
         if verbose:
             print(f"[{product}] DRY-RUN would write: {out_path} ({Hout}x{Wout})")
         return None
 
-    ensure_dir(jdir)
-    write_json_atomic(out_path, payload)
+    if data_b64:
+        # compact alternative to the nested list: little-endian float32, NaN = no data
+        payload["data_encoding"] = "f32le_b64"
+        payload["data_b64"] = base64.b64encode(coarse.astype("<f4").tobytes()).decode("ascii")
+        write_json_atomic(out_path, payload)
+    else:
+        # one vectorized round (in float64 for output)
+        rounded = np.round(coarse.astype(np.float64), 6)
+        if orjson is not None:
+            # orjson formats float64 rows straight from the buffer (NaN -> null)
+            data_rows = (rounded[i] for i in range(Hout))
+        else:
+            # stdlib json: non-finite cells become None per row
+            finite = np.isfinite(coarse)
+            data_rows = (rounded[i].tolist() if finite[i].all() else np.where(finite[i], rounded[i], None).tolist()
+                         for i in range(Hout))
+        write_json_atomic(out_path, payload, rows=data_rows)
+    if npy_sidecar:
+        # raw float32 grid (NaN = no data) for binary readers; written after the json
+        write_npy_atomic(out_path[:-5] + ".npy", coarse.astype(np.float32))
     nbytes = os.path.getsize(out_path)
     if verbose:
         print(f"[{product}] Wrote {out_path} ({nbytes} bytes)")
@@ -417,6 +658,9 @@ def sync_product(
     dry_run: bool = False,
     limit: Optional[int] = None,
     verbose: bool = False,
+    npy_sidecar: bool = False,
+    workers: int = 1,
+    data_b64: bool = False,
 ) -> int:
     pdir, jdir = product_paths(in_root, product)
     ensure_dir(jdir)
@@ -427,30 +671,56 @@ def sync_product(
     if limit is not None and limit > 0:
         wanted_gids = wanted_gids[:limit]
 
+    pending = [gid for gid in wanted_gids if not os.path.isfile(json_path_for_gid(jdir, product, gid))]
+    conv_kwargs = dict(
+        in_root=in_root,
+        product=product,
+        grid_deg=grid_deg,
+        cloud_th=(None if cloud_th is not None and cloud_th < 0 else cloud_th),
+        dry_run=dry_run,
+        verbose=verbose,
+        npy_sidecar=npy_sidecar,
+        data_b64=data_b64,
+        # read the CLDO4 index once per run instead of once per granule
+        cld_idx=load_input_index(in_root, "cldo4") if PRODUCTS[product]["uses_cloud"] else None,
+    )
+
     done = 0
-    for gid in wanted_gids:
-        out_path = json_path_for_gid(jdir, product, gid)
-        if os.path.isfile(out_path):
-            continue
-        try:
-            r = convert_nc_to_json(
-                in_root=in_root,
-                product=product,
-                gid=gid,
-                grid_deg=grid_deg,
-                cloud_th=(None if cloud_th is not None and cloud_th < 0 else cloud_th),
-                dry_run=dry_run,
-                verbose=verbose,
-            )
-            if r:
-                done += 1
-        except Exception as e:
-            if verbose:
-                print(f"[{product}] ERROR converting {gid}: {e}")
-                traceback.print_exc()
+    if workers > 1 and len(pending) > 1:
+        # Granules are independent; each worker process keeps its own _CLD_CACHE
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futs = {ex.submit(convert_nc_to_json, gid=gid, meta=inp_idx.get(gid, {}), **conv_kwargs): gid
+                    for gid in pending}
+            for fut in as_completed(futs):
+                try:
+                    if fut.result():
+                        done += 1
+                except Exception as e:
+                    if verbose:
+                        print(f"[{product}] ERROR converting {futs[fut]}: {e}")
+                        traceback.print_exc()
+    else:
+        for gid in pending:
+            try:
+                r = convert_nc_to_json(gid=gid, meta=inp_idx.get(gid, {}), **conv_kwargs)
+                if r:
+                    done += 1
+            except Exception as e:
+                if verbose:
+                    print(f"[{product}] ERROR converting {gid}: {e}")
+                    traceback.print_exc()
+
+    # One directory pass: granule JSON sizes (stale removal + index) and .npy sidecars
+    existing: Dict[str, int] = {}
+    sidecars = set()
+    with os.scandir(jdir) as it:
+        for entry in it:
+            if entry.name.endswith(".json") and entry.name != "index.json" and entry.is_file():
+                existing[entry.name] = entry.stat().st_size
+            elif entry.name.endswith(".npy"):
+                sidecars.add(entry.name)
 
     # Remove JSONs that are no longer present in the input index
-    existing = [f for f in os.listdir(jdir) if f.endswith(".json") and f != "index.json"]
     to_remove = []
     for fn in existing:
         gid2 = extract_gid_from_filename(fn)
@@ -464,6 +734,8 @@ def sync_product(
         else:
             try:
                 os.remove(p)
+                if os.path.basename(p)[:-5] + ".npy" in sidecars:
+                    os.remove(p[:-5] + ".npy")
                 if verbose:
                     print(f"[{product}] Removed stale JSON: {p}")
             except Exception as e:
@@ -474,15 +746,10 @@ def sync_product(
     out_index: Dict[str, dict] = {}
     for gid, meta in inp_idx.items():
         fn = os.path.basename(json_path_for_gid(jdir, product, gid))
-        out_file = os.path.join(jdir, fn)
-        if os.path.isfile(out_file):
-            try:
-                sz = os.path.getsize(out_file)
-            except Exception:
-                sz = None
+        if fn in existing:
             out_index[gid] = {
                 "file": fn,
-                "bytes": sz,
+                "bytes": existing[fn],
                 "t0": (meta.get("subset_time") or [meta.get("t0"), meta.get("t1")])[0],
                 "t1": (meta.get("subset_time") or [meta.get("t0"), meta.get("t1")])[-1],
                 "saved": now_utc_iso(),
@@ -507,6 +774,10 @@ def main():
     ap.add_argument("--cloud-th", type=float, default=0.3, help="Cloud fraction threshold (>0 enables, <0 disables)")
     ap.add_argument("--keep-hours", type=int, default=72, help="Hours to keep (compat with cron)")
     ap.add_argument("--limit", type=int, default=0, help="Limit number of granules (testing)")
+    ap.add_argument("--npy-sidecar", action="store_true", help="Also write a float32 .npy next to each JSON")
+    ap.add_argument("--data-b64", action="store_true",
+                    help="Write data as base64 little-endian float32 (data_b64) instead of nested lists")
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for granule conversion (default 1)")
     ap.add_argument("--dry-run", action="store_true", help="Do not write files; just simulate")
     ap.add_argument("--verbose", action="store_true", help="Verbose logs")
     ap.add_argument("--self-check", action="store_true", help="Quick environment/self check and exit")
@@ -536,6 +807,9 @@ def main():
             dry_run=args.dry_run,
             limit=limit,
             verbose=args.verbose,
+            npy_sidecar=args.npy_sidecar,
+            workers=args.workers,
+            data_b64=args.data_b64,
         )
         if args.verbose:
             print(f"[{args.product}] Converted {n} granule(s).")
@@ -7,14 +7,19 @@ Weather fetch job for ClimateWise (fixed + TEMPO-aligned)
   => shape/bbox/grid_deg will match exactly (fixes shape_bbox_mismatch)
 - Variables: u10, v10, blh
 - Time range: +1..+12h
-- Primary source: GFS 0.25° (OPeNDAP) | Fallback: Open-Meteo (single-point demo)
+- Primary source: GFS 0.25° (kerchunk refs if present, else OPeNDAP) | Fallback: Open-Meteo (single-point demo)
 - Outputs hourly slices as GZIP: storage/app/weather/meteo/json/<run_id>/+Hh.json.gz
+  (always written: the API reads them. WEATHER_OUT_FORMAT adds extra outputs:
+   npz|both: int16/uint16 +Hh.npz with a +Hh.meta.json sidecar;
+   ...,zarr: one consolidated <run_id>/slices.zarr store, chunks (1,H,W), zstd;
+   WEATHER_CONST_FIELDS=1: uniform grids as {"const": v, "shape": [H, W]})
 - index.json contains shape/bbox/grid_deg and is kept in sync with TEMPO
 - Keeps only the latest KEEP_RUNS runs
 """
 
-import os, sys, json, shutil, datetime, platform, gzip
+import os, sys, io, json, shutil, datetime, platform, gzip, hashlib, threading, uuid
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 print("PY:", sys.executable, "VER:", platform.python_version(), flush=True)
 
@@ -22,18 +27,100 @@ import numpy as np
 try:
     import xarray as xr   # for GFS netCDF
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("You need: pip install xarray netCDF4 requests")
     sys.exit(1)
+try:
+    import orjson  # serializes numpy grids natively (NaN -> null); stdlib json is the fallback
+except ImportError:
+    orjson = None
+try:
+    import zarr  # optional: consolidated slices.zarr store (WEATHER_OUT_FORMAT=...,zarr)
+except ImportError:
+    zarr = None
+try:
+    from numba import njit  # optional JIT for the fused grid clean/round pass
+except ImportError:
+    njit = None
 
 # ---------------- PATHS / CONFIG ----------------
 TEMPO_LATEST = Path("storage/app/tempo/no2/fc_support/latest.json")
 OUT_BASE     = Path("storage/app/weather/meteo/json")
+GFS_REFS     = Path("storage/app/tempo/gfs_refs")  # optional kerchunk refs: <YYYYMMDDHH>.json per cycle
+GRID_CACHE   = Path("storage/app/weather/meteo/grid_cache")  # outside OUT_BASE: cleanup_runs must not see it
 HOURS        = list(range(1, 13))
 KEEP_RUNS    = 3
 BLH0_M       = 800.0  # fallback BLH (m) if not available from GFS
+BLH_NAMES    = ('blh', 'hgtbl', 'hgtbls', 'hpbl', 'pblh')  # BLH names across GFS dataset versions, in preference order
+# Slice formats, comma-separated: "json" (+Hh.json.gz), "npz" (+Hh.npz + +Hh.meta.json), "zarr"
+# (slices.zarr), "both" = json,npz. json is always written while the PHP API reads it.
+OUT_FORMAT   = os.getenv("WEATHER_OUT_FORMAT", "json").lower()
+KNOWN_FORMATS = ("json", "npz", "zarr")
+# Uniform grids as {"const": v, "shape": [H, W]} instead of H×W repeats (needs a consumer that expands them)
+CONST_FIELDS = os.getenv("WEATHER_CONST_FIELDS", "0") == "1"
+GZ_LEVEL     = int(os.getenv("WEATHER_GZ_LEVEL", "6"))  # 1 = fastest, ~15% larger slices
+# Slices are written in parallel (zlib releases the GIL)
+WRITE_WORKERS = int(os.getenv("WEATHER_WRITE_WORKERS", str(min(8, os.cpu_count() or 1))))
+GRID_VARS    = {"u10": 2, "v10": 2, "blh": 1}  # grid variable -> decimals kept in JSON
+# npz storage (CF-style: phys = stored * scale_factor); blh in whole metres fits uint16
+NPZ_ENCODING = {
+    "u10": {"dtype": "int16",  "scale_factor": 0.01, "add_offset": 0.0, "_FillValue": -32768},
+    "v10": {"dtype": "int16",  "scale_factor": 0.01, "add_offset": 0.0, "_FillValue": -32768},
+    "blh": {"dtype": "uint16", "scale_factor": 1.0,  "add_offset": 0.0, "_FillValue": 65535},
+}
 # ------------------------------------------------
 
+# One keep-alive session for HTTP sources (retries transient failures with backoff)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+def load_json(path: Path):
+    """Parse a JSON file (orjson when available)."""
+    raw = Path(path).read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def dump_json(obj) -> bytes:
+    """Encode to compact UTF-8 JSON bytes (numpy values allowed with orjson)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def write_if_changed(path: Path, payload: bytes) -> bool:
+    """Atomically replace `path` with `payload` (tmp + os.replace) unless it already holds exactly these bytes."""
+    try:
+        if path.read_bytes() == payload:
+            return False
+    except OSError:
+        pass
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+    return True
+
+def cached_axis(path: Path, start: float, stop: float, n: int) -> np.ndarray:
+    """np.linspace(start, stop, n), saved as .npy on first use and memory-mapped afterwards."""
+    try:
+        arr = np.load(path, mmap_mode="r")
+        if arr.shape == (n,):
+            return arr
+    except (OSError, ValueError):
+        pass
+    arr = np.linspace(start, stop, n)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Grid cache write failed ({path}): {e}")
+    return arr
+
 def read_tempo_grid():
     """
     Read the TEMPO grid: shape=[H,W], bbox=[S,N,W,E], grid_deg.
@@ -41,7 +128,7 @@ def read_tempo_grid():
     """
     if not TEMPO_LATEST.is_file():
         raise FileNotFoundError(f"{TEMPO_LATEST} not found")
-    js = json.load(open(TEMPO_LATEST))
+    js = load_json(TEMPO_LATEST)
     shape = js.get("shape")
     bbox  = js.get("bbox")
     grid  = float(js.get("grid_deg", 0.1))
@@ -51,57 +138,134 @@ def read_tempo_grid():
 
     H, W = int(shape[0]), int(shape[1])
     S, N, Wdeg, Edeg = map(float, bbox)
-    # linspace => exactly H and W points (including edges)
-    lats = np.linspace(S, N, H)
-    lons = np.linspace(Wdeg, Edeg, W)
+    # linspace => exactly H and W points (including edges), memoized per grid
+    key = hashlib.md5(json.dumps([[H, W], [S, N, Wdeg, Edeg], grid]).encode()).hexdigest()[:12]
+    lats = cached_axis(GRID_CACHE / f"lats_{key}.npy", S, N, H)
+    lons = cached_axis(GRID_CACHE / f"lons_{key}.npy", Wdeg, Edeg, W)
     return dict(shape=[H, W], bbox=[S, N, Wdeg, Edeg], grid_deg=grid, lats=lats, lons=lons)
 
+def axis_weights(src, dst):
+    """
+    Linear interpolation prep along one axis: (i, w) so that value(dst) = a[i] + w*(a[i+1]-a[i]).
+    `src` must be ascending; targets outside [src[0], src[-1]] get w=NaN (like xarray.interp).
+    """
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    i = np.clip(np.searchsorted(src, dst, side="right") - 1, 0, src.size - 2)
+    w = (dst - src[i]) / (src[i + 1] - src[i])
+    w[(dst < src[0]) | (dst > src[-1])] = np.nan
+    return i, w
+
+def snap_nodes(i, w, tol=1e-6):
+    """If every target sits on a source node (w ~ 0 or 1), return the node indices, else None."""
+    if np.all(np.isfinite(w)) and np.all((w < tol) | (w > 1.0 - tol)):
+        return i + (w > 0.5)
+    return None
+
+def bilerp(a, iy, wy, ix, wx):
+    """
+    Bilinear sample of a[..., y, x] on the separable target grid (iy, wy) × (ix, wx).
+    A weight of None means that axis is aligned (iy/ix are node indices): plain take, no blend.
+    """
+    if wy is None:
+        rows = a[..., iy, :]
+    else:
+        top = a[..., iy, :]
+        rows = a[..., iy + 1, :]      # fresh copy (fancy indexing): blended in place
+        rows -= top
+        rows *= wy[:, None]
+        rows += top
+    if wx is None:
+        return rows[..., ix]
+    left = rows[..., ix]
+    out = rows[..., ix + 1]
+    out -= left
+    out *= wx
+    out += left
+    return out
+
+def open_gfs(cycle):
+    """
+    Open a GFS 0.25° cycle -> (dataset, source label).
+    - Prefers a kerchunk reference JSON (GFS_REFS/<YYYYMMDDHH>.json): byte-range reads of the GRIB mirror
+      (needs fsspec + zarr; refs are built outside this job)
+    - Falls back to the NOMADS OPeNDAP endpoint
+    """
+    ref = GFS_REFS / f"{cycle:%Y%m%d%H}.json"
+    if ref.is_file():
+        try:
+            ds = xr.open_dataset(
+                "reference://", engine="zarr",
+                backend_kwargs={"consolidated": False,
+                                "storage_options": {"fo": str(ref), "remote_protocol": "https"}},
+            )
+            # Match the OPeNDAP layout: lat/lon dims, time index == forecast hour
+            ds = ds.rename({k: v for k, v in (("latitude", "lat"), ("longitude", "lon")) if k in ds.variables})
+            if "step" in ds.dims and "time" not in ds.dims:
+                ds = ds.drop_vars("time", errors="ignore").rename({"step": "time"})
+            return ds, "GFS-0p25 kerchunk"
+        except Exception as e:
+            print(f"GFS reference open failed ({ref}): {e}; using OPeNDAP")
+
+    ymd = cycle.strftime("%Y%m%d")
+    hhz = cycle.strftime("%H")
+    url = f"https://nomads.ncep.noaa.gov:9090/dods/gfs_0p25/gfs{ymd}/gfs_0p25_{hhz}z"
+    return xr.open_dataset(url), "GFS-0p25 OPeNDAP"
+
 def fetch_from_gfs(hours, lats, lons, shape, bbox, grid_deg):
     """
-    Fetch from GFS 0.25° (OPeNDAP)
+    Fetch from GFS 0.25° (kerchunk reference or OPeNDAP, see open_gfs)
     - u10, v10 are guaranteed.
     - blh: try common variable names as availability differs across datasets.
     """
     cycle = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
     cycle = cycle - datetime.timedelta(hours=cycle.hour % 6)  # nearest 6-hourly cycle
-    ymd = cycle.strftime("%Y%m%d")
-    hhz = cycle.strftime("%H")
-    url = f"https://nomads.ncep.noaa.gov:9090/dods/gfs_0p25/gfs{ymd}/gfs_0p25_{hhz}z"
 
     try:
-        ds = xr.open_dataset(url)
+        ds, source = open_gfs(cycle)
     except Exception as e:
         print(f"GFS fetch failed: {e}")
-        return None, None
+        return None, None, None
 
-    try:
-        u10 = ds['u10']
-        v10 = ds['v10']
-    except Exception as e:
-        print(f"GFS dataset missing vars u10/v10: {e}")
-        return None, None
+    names = frozenset(ds.variables)
+    if 'u10' not in names or 'v10' not in names:
+        print("GFS dataset missing vars u10/v10")
+        return None, None, None
 
     # Attempt to find BLH (names vary between dataset versions)
-    blh_var = None
-    for cand in ['blh', 'hgtbl', 'hgtbls', 'hpbl', 'pblh']:
-        if cand in ds.variables:
-            blh_var = ds[cand]
-            break
+    blh_name = next((n for n in BLH_NAMES if n in names), None)
+
+    # Bilinear weights are computed once for the fixed target grid; only the source box
+    # covering the TEMPO bbox is read, for all hours/variables in one load
+    # (+H hours after cycle == time index H)
+    want = ['u10', 'v10'] + ([blh_name] if blh_name else [])
+    try:
+        if ds['lat'].values[0] > ds['lat'].values[-1]:
+            ds = ds.isel(lat=slice(None, None, -1))
+        iy, wy = axis_weights(ds['lat'].values, lats)
+        ix, wx = axis_weights(ds['lon'].values, lons)
+        y0, y1 = int(iy.min()), int(iy.max()) + 2
+        x0, x1 = int(ix.min()), int(ix.max()) + 2
+        # TEMPO grid on GFS nodes (e.g. 0.25° steps on grid lines): nearest-node take per axis
+        sy, sx = snap_nodes(iy, wy), snap_nodes(ix, wx)
+        if sy is not None:
+            iy, wy = sy, None
+        if sx is not None:
+            ix, wx = sx, None
+        block = ds[want].isel(time=list(hours), lat=slice(y0, y1), lon=slice(x0, x1)).load()
+        grids = {k: bilerp(block[k].values.astype(np.float64), iy - y0, wy, ix - x0, wx) for k in want}
+    except Exception as e:
+        print(f"GFS interp failed: {e}")
+        return None, None, None
+    U = grids['u10']
+    V = grids['v10']
+    BL = clean_round(grids[blh_name], clamp0=True, dtype=np.float64) if blh_name else None
 
     out = {}
-    for h in hours:
-        step = h  # +H hours after cycle
-        try:
-            u = u10.isel(time=step).interp(lat=lats, lon=lons).values
-            v = v10.isel(time=step).interp(lat=lats, lon=lons).values
-            if blh_var is not None:
-                bl = blh_var.isel(time=step).interp(lat=lats, lon=lons).values
-                bl = np.maximum(0.0, np.nan_to_num(bl))
-            else:
-                bl = np.full((shape[0], shape[1]), BLH0_M)
-        except Exception as e:
-            print(f"GFS interp failed for +{h}h: {e}")
-            continue
+    for i, h in enumerate(hours):
+        u = U[i]
+        v = V[i]
+        bl = BL[i] if BL is not None else np.full((shape[0], shape[1]), BLH0_M)
 
         valid_time = (cycle + datetime.timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M:%SZ")
         out[h] = dict(
@@ -112,11 +276,11 @@ def fetch_from_gfs(hours, lats, lons, shape, bbox, grid_deg):
             unit={"u10": "m/s", "v10": "m/s", "blh": "m"},
             t_offset=f"+{h}h",
             valid_time=valid_time,
-            u10=np.round(u, 2).tolist(),
-            v10=np.round(v, 2).tolist(),
-            blh=np.round(bl, 1).tolist(),
+            u10=u,
+            v10=v,
+            blh=bl,
         )
-    return out, cycle.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return out, cycle.strftime("%Y-%m-%dT%H:%M:%SZ"), source
 
 def fetch_from_openmeteo(hours, lats, lons, shape, bbox, grid_deg):
     """
@@ -131,7 +295,7 @@ def fetch_from_openmeteo(hours, lats, lons, shape, bbox, grid_deg):
     }
 
     try:
-        r = requests.get(url, params=params, timeout=30)
+        r = HTTP_SESSION.get(url, params=params, timeout=(5, 30))
         r.raise_for_status()
         js = r.json()
         spd = js["hourly"]["windspeed_10m"]
@@ -143,6 +307,14 @@ def fetch_from_openmeteo(hours, lats, lons, shape, bbox, grid_deg):
     now = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
     H, W = shape
     out = {}
+    # The field is uniform: build one read-only H×W grid per distinct value and share it across hours
+    grids = {}
+    def const_grid(val):
+        g = grids.get(val)
+        if g is None:
+            g = grids[val] = np.full((H, W), val)
+            g.setflags(write=False)
+        return g
 
     for h in hours:
         idx = h if h < len(spd) else -1
@@ -166,25 +338,204 @@ def fetch_from_openmeteo(hours, lats, lons, shape, bbox, grid_deg):
             unit={"u10": "m/s", "v10": "m/s", "blh": "m"},
             t_offset=f"+{h}h",
             valid_time=valid_time,
-            u10=np.round(np.full((H, W), u), 2).tolist(),
-            v10=np.round(np.full((H, W), v), 2).tolist(),
-            blh=np.round(np.full((H, W), BLH0_M), 1).tolist(),
+            u10=const_grid(float(u)),
+            v10=const_grid(float(v)),
+            blh=const_grid(BLH0_M),
         )
     return out
 
+if njit is not None:
+    # no fastmath: it lets LLVM assume no NaN, which breaks the finite/NaN tests.
+    # nogil instead of parallel=True: slices are already written on a thread pool, and numba's
+    # threading layer launched from those threads can hang the interpreter at exit (TBB unload).
+    @njit(nogil=True, cache=True)
+    def _clean_round_kernel(x, scale, clamp0, out):
+        """clamp0: non-finite/negative -> 0; scale > 0: round half-even to 1/scale; written to `out` (one pass)."""
+        for i in range(x.shape[0]):
+            for j in range(x.shape[1]):
+                v = x[i, j]
+                if clamp0 and (not np.isfinite(v) or v < 0.0):
+                    v = 0.0
+                if scale > 0.0:
+                    v = np.rint(v * scale) / scale
+                out[i, j] = v
+
+def clean_round(x, decimals=None, clamp0=False, dtype=np.float32) -> np.ndarray:
+    """
+    C-contiguous `dtype` copy of a grid, optionally with NaN/inf/negatives set to 0 (clamp0)
+    and rounded to `decimals`. One fused pass with numba; the numpy path gives the same values.
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    if njit is not None:
+        out = np.empty(x.shape, dtype=dtype)
+        scale = 10.0 ** decimals if decimals is not None else 0.0
+        _clean_round_kernel(x.reshape(-1, x.shape[-1]), scale, clamp0, out.reshape(-1, x.shape[-1]))
+        return out
+    if clamp0:
+        x = np.where(np.isfinite(x) & (x > 0.0), x, 0.0)
+    if decimals is not None:
+        x = np.round(x, decimals)
+    return x.astype(dtype)
+
+def encode_const(arr, decimals):
+    """{"const": v, "shape": [H, W]} if every cell of `arr` holds the same finite value, else None."""
+    arr = np.asarray(arr)
+    if arr.size == 0:
+        return None
+    v = arr.flat[0]
+    if not np.isfinite(v) or arr.min() != v or arr.max() != v:
+        return None
+    return {"const": round(float(v), decimals), "shape": list(arr.shape)}
+
+def slice_to_json(data: dict) -> dict:
+    """
+    Slice with grid arrays -> JSON-ready dict (grids rounded).
+    With orjson the grids stay float32 arrays (shortest repr prints the same decimals), else nested lists.
+    With CONST_FIELDS, uniform grids are written as {"const", "shape"}.
+    """
+    out = {}
+    for k, v in data.items():
+        if k in GRID_VARS:
+            c = encode_const(v, GRID_VARS[k]) if CONST_FIELDS else None
+            if c is not None:
+                v = c
+            elif orjson is not None:
+                v = clean_round(v, GRID_VARS[k])
+            else:
+                v = np.round(np.asarray(v, dtype=np.float64), GRID_VARS[k]).tolist()
+        out[k] = v
+    return out
+
 def write_json_gz(path: Path, obj: dict):
     """Write JSON as gzip to reduce file size."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(path, "wt", encoding="utf-8") as f:
+    if orjson is not None:
+        # One C-level encode straight from the numpy buffers, one write into zlib
+        with gzip.GzipFile(path, mode="wb", compresslevel=GZ_LEVEL) as gz:
+            gz.write(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+        return
+    # json.dump emits many tiny chunks; buffer them before they reach zlib
+    with open(path, "wb") as raw, \
+         gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZ_LEVEL) as gz, \
+         io.BufferedWriter(gz, buffer_size=1 << 16) as buf, \
+         io.TextIOWrapper(buf, encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False)
 
+def quantize(x, enc: dict) -> np.ndarray:
+    """Float grid -> packed integers per `enc` (NaN -> _FillValue, out of range clipped)."""
+    info = np.iinfo(enc["dtype"])
+    fill = enc["_FillValue"]
+    lo, hi = info.min, info.max
+    if fill == lo:
+        lo += 1
+    elif fill == hi:
+        hi -= 1
+    q = np.array(x, dtype=np.float64)  # one working copy, then in place
+    q -= enc["add_offset"]
+    q /= enc["scale_factor"]
+    np.round(q, out=q)
+    bad = ~np.isfinite(q)
+    np.clip(q, lo, hi, out=q)
+    q[bad] = fill
+    return q.astype(enc["dtype"])
+
+def write_npz(path: Path, data: dict):
+    """Binary slice: packed integer grids (NPZ_ENCODING) in a compressed .npz plus a .meta.json sidecar."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, **{k: quantize(data[k], NPZ_ENCODING[k]) for k in GRID_VARS})
+    meta = {k: v for k, v in data.items() if k not in GRID_VARS}
+    meta["encoding"] = NPZ_ENCODING
+    path.with_name(path.name[:-len(".npz")] + ".meta.json").write_bytes(dump_json(meta))
+
+def parse_out_formats(raw: str) -> set:
+    """WEATHER_OUT_FORMAT -> set of known formats; unknown names are reported and ignored, json is always in."""
+    fmts = {"json"}
+    for f in raw.split(","):
+        f = f.strip()
+        if not f:
+            continue
+        if f == "both":
+            fmts.update(("json", "npz"))
+        elif f in KNOWN_FORMATS:
+            fmts.add(f)
+        else:
+            print(f"Ignoring unknown WEATHER_OUT_FORMAT entry {f!r} (known: {', '.join(KNOWN_FORMATS)}, both)")
+    return fmts
+
+OUT_FORMATS = parse_out_formats(OUT_FORMAT)
+
+def write_slice(run_dir: Path, h: int, data: dict):
+    """Write one +Hh slice in the configured OUT_FORMATS."""
+    if "json" in OUT_FORMATS:
+        write_json_gz(run_dir / f"+{h}h.json.gz", slice_to_json(data))
+    if "npz" in OUT_FORMATS:
+        write_npz(run_dir / f"+{h}h.npz", data)
+
+def empty_trash(base: Path):
+    """Delete base/.trash (runs retired by earlier cleanups) on a background thread."""
+    trash = base / ".trash"
+    if not trash.is_dir():
+        return None
+    t = threading.Thread(target=shutil.rmtree, args=(trash,), kwargs={"ignore_errors": True})
+    t.start()
+    return t
+
+def write_zarr(path: Path, slices: dict):
+    """
+    All hours in one consolidated Zarr store: u10/v10/blh as float32 (T,H,W), one (1,H,W) chunk per hour,
+    zstd-compressed. Slice metadata (hours, valid_time, bbox, ...) goes into the group attrs.
+    Built next to the target and renamed into place.
+    """
+    hours = sorted(slices)
+    first = slices[hours[0]]
+    H, W = first["shape"]
+    tmp = path.with_name(path.name + ".part")
+    shutil.rmtree(tmp, ignore_errors=True)
+    from numcodecs import Blosc  # ships with zarr
+    comp = Blosc(cname="zstd", clevel=3)
+    # Zarr format 2 on zarr 2 and 3 alike: consolidated metadata is standard there and readable by both
+    v3 = int(zarr.__version__.split(".")[0]) >= 3
+    root = zarr.open_group(str(tmp), mode="w", **({"zarr_format": 2} if v3 else {}))
+    for k in GRID_VARS:
+        data = np.stack([np.asarray(slices[h][k], dtype=np.float32) for h in hours])
+        if v3:
+            arr = root.create_array(k, shape=data.shape, chunks=(1, H, W), dtype="f4",
+                                    compressors=comp, fill_value=np.nan)
+        else:
+            arr = root.create_dataset(k, shape=data.shape, chunks=(1, H, W), dtype="f4",
+                                      compressor=comp, fill_value=np.nan)
+        arr[:] = data
+        arr.attrs.update(unit=first["unit"][k], _ARRAY_DIMENSIONS=["hour", "lat", "lon"])  # dims for xarray
+    root.attrs.update(
+        product=first["product"],
+        grid_deg=first["grid_deg"],
+        bbox=[float(b) for b in first["bbox"]],
+        shape=[int(H), int(W)],
+        hours=[int(h) for h in hours],
+        t_offset=[slices[h]["t_offset"] for h in hours],
+        valid_time=[slices[h]["valid_time"] for h in hours],
+    )
+    zarr.consolidate_metadata(str(tmp))
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
 def cleanup_runs(base: Path, keep: int):
-    runs = sorted([d for d in base.iterdir() if d.is_dir()], reverse=True)
+    """
+    Keep the newest `keep` runs. Older run dirs are only renamed into base/.trash (atomic, O(1));
+    the next run's empty_trash deletes them while it is busy fetching.
+    """
+    runs = sorted([d for d in base.iterdir() if d.is_dir() and not d.name.startswith(".")], reverse=True)
+    trash = base / ".trash"
     for old in runs[keep:]:
-        shutil.rmtree(old, ignore_errors=True)
+        try:
+            trash.mkdir(exist_ok=True)
+            old.rename(trash / f"{old.name}.{uuid.uuid4().hex[:8]}")
+        except OSError:
+            shutil.rmtree(old, ignore_errors=True)
 
 def main():
     OUT_BASE.mkdir(parents=True, exist_ok=True)
+    sweeper = empty_trash(OUT_BASE)  # overlaps with the network fetch below
 
     # 1) Read grid from TEMPO
     tg = read_tempo_grid()
@@ -197,8 +548,7 @@ def main():
     run_dir.mkdir(parents=True, exist_ok=True)
 
     # 3) Try GFS → then fallback
-    slices, cycle = fetch_from_gfs(HOURS, lats, lons, shape, bbox, grid_deg)
-    source = "GFS-0p25 OPeNDAP"
+    slices, cycle, source = fetch_from_gfs(HOURS, lats, lons, shape, bbox, grid_deg)
     fallback = False
 
     if not slices:
@@ -212,9 +562,25 @@ def main():
         print("Weather fetch failed completely")
         sys.exit(1)
 
-    # 4) Save slices (GZIP): +Hh.json.gz
-    for h, data in slices.items():
-        write_json_gz(run_dir / f"+{h}h.json.gz", data)
+    # 4) Save slices (GZIP): +Hh.json.gz and/or binary +Hh.npz, one thread per slice
+    #    (+ the consolidated slices.zarr store alongside, if requested)
+    want_zarr = "zarr" in OUT_FORMATS
+    if want_zarr and zarr is None:
+        print("WEATHER_OUT_FORMAT asks for zarr but zarr is not installed; skipping the store")
+        want_zarr = False
+    with ThreadPoolExecutor(max_workers=max(1, min(WRITE_WORKERS, len(slices)))) as ex:
+        jobs = [ex.submit(write_slice, run_dir, h, data) for h, data in slices.items()]
+        zarr_job = ex.submit(write_zarr, run_dir / "slices.zarr", slices) if want_zarr else None
+        for j in jobs:
+            j.result()
+        if zarr_job is not None:
+            # the store is an extra: a failure must not cost the run its JSON slices/index
+            try:
+                zarr_job.result()
+            except Exception as e:
+                print(f"Zarr store failed: {e}; continuing with the JSON slices")
+                shutil.rmtree(run_dir / "slices.zarr.part", ignore_errors=True)
+                want_zarr = False
 
     # 5) index.json with TEMPO-aligned shape/bbox
     index = dict(
@@ -227,10 +593,13 @@ def main():
         cycle=cycle,
         fallback=fallback,
     )
-    with open(OUT_BASE / "index.json", "w") as f:
-        json.dump(index, f, ensure_ascii=False)
+    if want_zarr:
+        index["store"] = "slices.zarr"
+    write_if_changed(OUT_BASE / "index.json", dump_json(index))
 
-    # 6) Cleanup older runs
+    # 6) Cleanup older runs (must not race the sweeper over .trash)
+    if sweeper is not None:
+        sweeper.join()
     cleanup_runs(OUT_BASE, KEEP_RUNS)
 
     print(f"Weather run {run_id} complete, source={source}, fallback={fallback}")